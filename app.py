@@ -5,26 +5,56 @@ Convert Ngoc Son Internal TSS to Standard Internal TSS
 """
 
 import streamlit as st
-import pandas as pd
+import gc
+import hashlib
 import io
+import logging
+import multiprocessing
 import os
+import queue
+import re
+import shutil
+import stat
+import sys
 import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 import time
 import traceback
+import uuid
 
-# Import our pipeline modules
-from validation_utils import ValidationError, handle_validation_error
-from pipeline_validator import validate_before_pipeline
-from step1_unmerge_standalone import ExcelUnmerger
-from step2_header_processing import HeaderProcessor
-from step3_template_creation import TemplateCreator
-from step4_article_filling import ArticleFiller
-from step5_data_transformation import DataTransformer
-from step6_sd_processing import SDProcessor
-from step7_finished_product import FinishedProductProcessor
-from step8_document_processing import DocumentProcessor
+logger = logging.getLogger(__name__)
+
+# Accepted upload extensions (without the dot) and size limit
+ALLOWED_EXTENSIONS = frozenset({"xlsx", "xls", "xlsm"})
+MAX_UPLOAD_SIZE = 200 * 1024 * 1024
+
+# Chunk size used when streaming the upload to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Directory containing app.py and its static assets
+APP_DIR = Path(__file__).resolve().parent
+
+# Uploads up to this size are processed in a RAM-backed directory when one is available
+IN_MEMORY_MAX_SIZE = 64 * 1024 * 1024
+SHM_DIR = Path("/dev/shm")
+
+# Converted files served by the download button, named by pipeline code version and
+# upload content hash. Doubles as the conversion cache; least recently used files are
+# evicted past the size cap. The directory is private to the user running the app.
+RESULTS_DIR = Path(tempfile.gettempdir()) / "sedo-tss-converter"
+RESULTS_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+# Partial result files older than this (seconds) were left by a crashed conversion
+STALE_PART_AGE = 60 * 60
+
+# How often (seconds) the script thread checks the worker for progress
+PROGRESS_POLL_INTERVAL = 0.1
+
+# Minimum time (seconds) between progress renders, i.e. at most ~10 updates/second
+PROGRESS_MIN_INTERVAL = 0.1
 
 # Configure page
 st.set_page_config(
@@ -34,186 +64,104 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Custom CSS for styling
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    html, body, [class*="css"] {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .main-header {
-        text-align: center;
-        padding: 2rem 0;
-        margin-bottom: 2rem;
-    }
-    
-    .main-title {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #1f2937;
-        margin-bottom: 0.5rem;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        gap: 0.5rem;
-    }
-    
-    .chart-icon {
-        font-size: 2.2rem;
-        background: linear-gradient(45deg, #3b82f6, #10b981, #f59e0b);
-        -webkit-background-clip: text;
-        background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
-    
-    .main-subtitle {
-        font-size: 1.1rem;
-        color: #6b7280;
-        font-weight: 400;
-        margin-top: 0.5rem;
-    }
-    
-    .upload-section {
-        background: #f8fafc;
-        border: 2px dashed #d1d5db;
-        border-radius: 12px;
-        padding: 3rem 2rem;
-        text-align: center;
-        margin: 2rem 0;
-        transition: all 0.3s ease;
-    }
-    
-    .upload-section:hover {
-        border-color: #3b82f6;
-        background: #f0f9ff;
-    }
-    
-    .upload-icon {
-        font-size: 3rem;
-        color: #9ca3af;
-        margin-bottom: 1rem;
-    }
-    
-    .upload-title {
-        font-size: 1.25rem;
-        font-weight: 600;
-        color: #374151;
-        margin-bottom: 0.5rem;
-    }
-    
-    .upload-subtitle {
-        color: #6b7280;
-        margin-bottom: 2rem;
-    }
-    
-    .file-constraints {
-        font-size: 0.875rem;
-        color: #9ca3af;
-        margin-top: 1rem;
-    }
-    
-    .process-card {
-        background: white;
-        border: 1px solid #e5e7eb;
-        border-radius: 8px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-    }
-    
-    .step-indicator {
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-        margin-bottom: 1rem;
-    }
-    
-    .step-number {
-        background: #3b82f6;
-        color: white;
-        width: 24px;
-        height: 24px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 0.75rem;
-        font-weight: 600;
-    }
-    
-    .step-completed {
-        background: #10b981;
-    }
-    
-    .step-current {
-        background: #f59e0b;
-    }
-    
-    .progress-bar {
-        background: #e5e7eb;
-        height: 8px;
-        border-radius: 4px;
-        overflow: hidden;
-        margin: 1rem 0;
-    }
-    
-    .progress-fill {
-        background: linear-gradient(90deg, #3b82f6, #10b981);
-        height: 100%;
-        transition: width 0.3s ease;
-    }
-    
-    .success-message {
-        background: #f0fdf4;
-        border: 1px solid #bbf7d0;
-        border-radius: 8px;
-        padding: 1rem;
-        color: #166534;
-        margin: 1rem 0;
-    }
-    
-    .error-message {
-        background: #fef2f2;
-        border: 1px solid #fecaca;
-        border-radius: 8px;
-        padding: 1rem;
-        color: #dc2626;
-        margin: 1rem 0;
-    }
-    
-    .download-section {
-        text-align: center;
-        padding: 2rem;
-        background: #f8fafc;
-        border-radius: 12px;
-        margin: 2rem 0;
+# Custom CSS for styling (read once per server process, re-emitted on each rerun
+# because Streamlit drops elements that a rerun does not draw again)
+@st.cache_resource
+def load_css():
+    """Load the app stylesheet from assets/app.css, minified (it is re-sent on every rerun)"""
+    css = (APP_DIR / "assets" / "app.css").read_text(encoding="utf-8")
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};,])\s*", r"\1", css).strip()
+
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+# Processor method run_pipeline_steps calls for each step, checked on import so a
+# renamed method fails the conversion up front instead of after the earlier steps
+PIPELINE_STEP_METHODS = {
+    "ExcelUnmerger": "unmerge_file",
+    "HeaderProcessor": "process_file",
+    "TemplateCreator": "create_template",
+    "ArticleFiller": "fill_article_info",
+    "DataTransformer": "transform_data",
+    "SDProcessor": "process_sd_data",
+    "FinishedProductProcessor": "process_finished_products",
+    "DocumentProcessor": "process_step7",
+}
+
+def _import_pipeline():
+    """Import our pipeline modules (and openpyxl with them) and check their step methods"""
+    from validation_utils import ValidationError
+    from pipeline_validator import validate_before_pipeline
+    from step1_unmerge_standalone import ExcelUnmerger
+    from step2_header_processing import HeaderProcessor
+    from step3_template_creation import TemplateCreator
+    from step4_article_filling import ArticleFiller
+    from step5_data_transformation import DataTransformer
+    from step6_sd_processing import SDProcessor
+    from step7_finished_product import FinishedProductProcessor
+    from step8_document_processing import DocumentProcessor
+    
+    pipeline = {
+        "ValidationError": ValidationError,
+        "validate_before_pipeline": validate_before_pipeline,
+        "ExcelUnmerger": ExcelUnmerger,
+        "HeaderProcessor": HeaderProcessor,
+        "TemplateCreator": TemplateCreator,
+        "ArticleFiller": ArticleFiller,
+        "DataTransformer": DataTransformer,
+        "SDProcessor": SDProcessor,
+        "FinishedProductProcessor": FinishedProductProcessor,
+        "DocumentProcessor": DocumentProcessor,
     }
     
-    /* Hide Streamlit default elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    .stDeployButton {display: none;}
-    
-    /* Custom button styling */
-    .stButton > button {
-        background: #3b82f6;
-        color: white;
-        border: none;
-        border-radius: 6px;
-        padding: 0.5rem 2rem;
-        font-weight: 500;
-        transition: all 0.2s ease;
-    }
+    missing = [f"{name}.{method}" for name, method in PIPELINE_STEP_METHODS.items()
+               if not callable(getattr(pipeline[name], method, None))]
+    if missing:
+        raise ImportError(f"Pipeline step methods not found: {', '.join(missing)}")
     
-    .stButton > button:hover {
-        background: #2563eb;
-        transform: translateY(-1px);
-    }
-</style>
-""", unsafe_allow_html=True)
+    pipeline["code_version"] = pipeline_code_version(pipeline.values())
+    return pipeline
+
+def pipeline_code_version(pipeline_objects):
+    """
+    Short hash of the source of app.py and every module the pipeline objects come from
+    
+    Part of each cached result's name, so a deploy that changes any step never
+    serves a workbook converted by the previous code.
+    """
+    source_files = {Path(__file__).resolve()}
+    source_files.update(Path(sys.modules[obj.__module__].__file__).resolve() for obj in pipeline_objects)
+    
+    version = hashlib.blake2b(digest_size=8)
+    for source_file in sorted(source_files):
+        version.update(source_file.read_bytes())
+    return version.hexdigest()
+
+# Start method for the pipeline's worker processes, chosen once per server process.
+# Forking the multithreaded server would copy locks held by its other threads into
+# the child, so workers come from a fork server (with the pipeline modules
+# preloaded) or, where that is unavailable, are spawned.
+@st.cache_resource
+def process_context():
+    """Multiprocessing context for the pipeline's worker processes"""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["pipeline_validator", "step1_unmerge_standalone"])
+    return context
+
+# Pipeline imports run on a background thread, once per server process, so the
+# first page paints without waiting for them; callers resolve the future first
+# (and clear this cache when it failed, so the next run retries the import)
+@st.cache_resource
+def start_pipeline_import():
+    """Start importing the pipeline modules in the background"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(_import_pipeline)
+    executor.shutdown(wait=False)  # The submitted import still runs; the thread exits after it
+    return future
 
 def show_header():
     """Display the main header section"""
@@ -245,135 +193,427 @@ def validate_uploaded_file(uploaded_file):
         return False, "No file uploaded"
     
     # Check file extension
-    if not uploaded_file.name.lower().endswith(('.xlsx', '.xls', '.xlsm')):
+    _, dot, extension = uploaded_file.name.rpartition('.')
+    if not dot or extension.lower() not in ALLOWED_EXTENSIONS:
         return False, "Invalid file format. Please upload .xlsx, .xls, or .xlsm file"
     
     # Check file size (limit 200MB as shown in the image)
-    if uploaded_file.size > 200 * 1024 * 1024:
+    if uploaded_file.size > MAX_UPLOAD_SIZE:
         return False, "File too large. Maximum size is 200MB"
     
     return True, "File validation passed"
 
-def process_pipeline(uploaded_file, progress_placeholder, status_placeholder):
+PIPELINE_STEPS = [
+    "Validating input file",
+    "Unmerging cells", 
+    "Processing headers",
+    "Creating template",
+    "Filling article information",
+    "Transforming data",
+    "Processing SD data",
+    "Validating finished products", 
+    "Processing final document"
+]
+
+def discard_intermediates(outputs, *steps):
+    """Delete intermediate step files no later step reads and free openpyxl's cell graphs"""
+    for step in steps:
+        Path(outputs.pop(step)).unlink(missing_ok=True)
+    # openpyxl cells and worksheets reference each other, so the previous
+    # step's workbook is only reclaimed by the cycle collector
+    gc.collect()
+
+def run_pipeline_steps(input_file, temp_dir, pipeline, report_progress):
+    """
+    Run the 8 pipeline steps on a saved input file
+    
+    Args:
+        input_file: Path to the uploaded file inside temp_dir
+        temp_dir: Working directory for intermediate outputs
+        pipeline: Pipeline classes and functions returned by _import_pipeline()
+        report_progress: Callback receiving the index of the step about to start
+        
+    Returns:
+        Path to the final Step 8 file
+    """
+    # Track outputs
+    outputs = {}
+    current_step = 0
+    
+    # Every processor takes the working directory and input as plain strings
+    base_dir = str(temp_dir)
+    input_path = str(input_file)
+    
+    # Step 0 + Step 1: Validation and unmerging only read the input file, so both
+    # workbook loads run in separate processes (openpyxl parsing holds the GIL).
+    # The input is validated once here; steps 1, 2 and 4 skip their own pre-flight
+    # check, which would re-parse the same workbook twice per step.
+    # Submitted callables must be picklable: module-level functions and bound
+    # methods of processors built from plain paths.
+    # multiprocessing.Pool (rather than ProcessPoolExecutor) because a failure must
+    # not wait for the unmerge: Pool.terminate() stops running workers, so nothing
+    # keeps writing into the working directory while it is being removed.
+    report_progress(current_step)
+    
+    pool = process_context().Pool(processes=2)
+    try:
+        validation_result = pool.apply_async(pipeline["validate_before_pipeline"], (input_path, False))
+        unmerge_result = pool.apply_async(pipeline["ExcelUnmerger"](base_dir).unmerge_file, (input_path,),
+                                          {"skip_preflight": True})
+        
+        if not validation_result.get():
+            raise pipeline["ValidationError"]("Input file validation failed")
+        
+        current_step += 1
+        
+        # Step 1: Unmerge cells
+        report_progress(current_step)
+        outputs['step1'] = unmerge_result.get()
+        current_step += 1
+    except BaseException:
+        pool.terminate()
+        raise
+    pool.close()
+    pool.join()
+    
+    # Step 2: Header processing
+    report_progress(current_step)
+    processor = pipeline["HeaderProcessor"](base_dir)
+    outputs['step2'] = processor.process_file(outputs['step1'], skip_preflight=True)
+    del processor
+    discard_intermediates(outputs, 'step1')
+    current_step += 1
+    
+    # Step 3: Template creation
+    report_progress(current_step)
+    creator = pipeline["TemplateCreator"](base_dir)
+    outputs['step3'] = creator.create_template(outputs['step2'])
+    del creator
+    current_step += 1
+    
+    # Step 4: Article filling
+    report_progress(current_step)
+    filler = pipeline["ArticleFiller"](base_dir)
+    outputs['step4'] = filler.fill_article_info(input_path, outputs['step3'], skip_preflight=True)
+    del filler
+    discard_intermediates(outputs, 'step3')
+    current_step += 1
+    
+    # Step 5: Data transformation
+    report_progress(current_step)
+    transformer = pipeline["DataTransformer"](base_dir)
+    outputs['step5'] = transformer.transform_data(outputs['step2'], outputs['step4'])
+    del transformer
+    discard_intermediates(outputs, 'step4')
+    current_step += 1
+    
+    # Step 6: SD processing
+    report_progress(current_step)
+    sd_processor = pipeline["SDProcessor"](base_dir)
+    outputs['step6'] = sd_processor.process_sd_data(outputs['step2'], step4_file=outputs['step5'])
+    del sd_processor
+    discard_intermediates(outputs, 'step2', 'step5')
+    current_step += 1
+    
+    # Step 7: Finished product validation
+    report_progress(current_step)
+    product_processor = pipeline["FinishedProductProcessor"](base_dir)
+    outputs['step7'] = product_processor.process_finished_products(outputs['step6'])
+    del product_processor
+    discard_intermediates(outputs, 'step6')
+    current_step += 1
+    
+    # Step 8: Final document processing
+    report_progress(current_step)
+    doc_processor = pipeline["DocumentProcessor"](base_dir)
+    outputs['step8'] = doc_processor.process_step7(outputs['step7'])
+    
+    return outputs['step8']
+
+def convert_upload(file_hash, file_name, uploaded_file, pipeline, report_progress):
+    """
+    Run the pipeline on an uploaded file and return the path of the converted workbook
+    
+    Results are cached on disk in RESULTS_DIR under the pipeline code version
+    and the upload's content hash, so converting the same file again with the
+    same code (re-uploading it, clicking Start Conversion twice, or after a
+    server restart) skips all 8 steps.
+    
+    The result is returned as a path rather than bytes, so the download
+    button reads it from disk only when the user clicks it.
+    """
+    results_dir = private_results_dir()
+    if not results_dir.is_dir():  # Removed since it was checked, e.g. by a temp cleaner
+        private_results_dir.clear()
+        results_dir = private_results_dir()
+    output_file = results_dir / f"{pipeline['code_version']}-{file_hash}.xlsx"
+    try:
+        os.utime(output_file)  # Mark as recently used for eviction
+        return str(output_file)
+    except FileNotFoundError:
+        pass
+    
+    # Create temporary directory for processing
+    with tempfile.TemporaryDirectory(dir=working_dir_root(uploaded_file.size)) as temp_dir:
+        temp_dir = Path(temp_dir)
+        
+        # Save uploaded file (stream in 1MB chunks instead of copying the whole buffer)
+        input_file = temp_dir / file_name
+        uploaded_file.seek(0)
+        with open(input_file, "wb") as f:
+            shutil.copyfileobj(uploaded_file, f, length=UPLOAD_CHUNK_SIZE)
+        
+        result_file = run_pipeline_steps(input_file, temp_dir, pipeline, report_progress)
+        
+        # Move the result out before the temporary directory is removed. The move
+        # may copy across filesystems, so it goes to a unique name first and is
+        # renamed into place, so other sessions never see a partial file.
+        partial_file = results_dir / f"{file_hash}.{uuid.uuid4().hex}.part"
+        shutil.move(result_file, partial_file)
+        os.replace(partial_file, output_file)
+    
+    evict_cached_results(keep=output_file, code_version=pipeline["code_version"])
+    return str(output_file)
+
+@st.cache_resource(show_spinner=False)
+def private_results_dir():
+    """
+    Create RESULTS_DIR if needed and check that only this user can use it
+    
+    Runs once per server process (convert_upload calls it again only if the
+    directory has since been removed). The path is predictable and shared, so a
+    directory created by someone else (who could plant results in it) or a
+    symlink is refused rather than served from.
+    
+    Raises:
+        PermissionError: If the directory is not a directory owned by this user
+    """
+    RESULTS_DIR.mkdir(mode=0o700, exist_ok=True)
+    info = os.lstat(RESULTS_DIR)
+    if not stat.S_ISDIR(info.st_mode) or (hasattr(os, "getuid") and info.st_uid != os.getuid()):
+        raise PermissionError(f"Results directory {RESULTS_DIR} is not a directory owned by this user")
+    
+    if info.st_mode & 0o077:
+        os.chmod(RESULTS_DIR, 0o700)
+    if info.st_mode & 0o022:
+        # Others could have written into it: drop whatever it holds (the directory
+        # itself stays, so paths other threads already resolved remain valid)
+        for entry in RESULTS_DIR.iterdir():
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink(missing_ok=True)
+    return RESULTS_DIR
+
+def evict_cached_results(keep, code_version):
+    """
+    Remove results converted by other code versions and partial files left by
+    crashed conversions, then least recently used results while RESULTS_DIR
+    exceeds RESULTS_CACHE_MAX_SIZE
+    """
+    stale_before = time.time() - STALE_PART_AGE
+    for path in RESULTS_DIR.glob("*.part"):
+        try:
+            if path.stat().st_mtime < stale_before:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            continue  # Renamed into place or removed by another session
+    
+    entries = []
+    for path in RESULTS_DIR.glob("*.xlsx"):
+        if not path.name.startswith(f"{code_version}-"):
+            path.unlink(missing_ok=True)  # Never served again
+            continue
+        try:
+            info = path.stat()
+        except FileNotFoundError:
+            continue  # Evicted by another session
+        entries.append((info.st_mtime, info.st_size, path))
+    
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= RESULTS_CACHE_MAX_SIZE:
+            break
+        if path != keep:
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+def working_dir_root(upload_size):
+    """
+    Parent directory for the pipeline's temporary working directory
+    
+    Every step reads and writes files by path (openpyxl, and the process pool
+    needs picklable paths), so small uploads keep those files on tmpfs instead
+    of a disk-backed temp directory. Falls back to the default temp directory
+    for large uploads or when /dev/shm lacks room for the intermediates.
+    """
+    if upload_size > IN_MEMORY_MAX_SIZE or not SHM_DIR.is_dir() or not os.access(SHM_DIR, os.W_OK):
+        return None
+    
+    try:
+        free_space = shutil.disk_usage(SHM_DIR).free
+    except OSError:
+        return None
+    
+    # One intermediate workbook per step, each roughly the size of the input
+    return str(SHM_DIR) if free_space > upload_size * len(PIPELINE_STEPS) else None
+
+def hash_uploaded_file(uploaded_file):
+    """
+    Content hash of the upload, used as the conversion cache key
+    
+    Hashed once per upload: the digest is kept in session state under the
+    upload's file_id, so later reruns reuse it instead of re-reading the file.
+    """
+    cached = st.session_state.get("upload_hash")
+    if cached is not None and cached[0] == uploaded_file.file_id:
+        return cached[1]
+    
+    uploaded_file.seek(0)
+    hasher = hashlib.blake2b(digest_size=16)
+    for chunk in iter(partial(uploaded_file.read, UPLOAD_CHUNK_SIZE), b""):
+        hasher.update(chunk)
+    digest = hasher.hexdigest()
+    st.session_state["upload_hash"] = (uploaded_file.file_id, digest)
+    return digest
+
+def process_pipeline(uploaded_file, progress_placeholder):
     """Process the complete 8-step pipeline"""
     
-    steps = [
-        "Validating input file",
-        "Unmerging cells", 
-        "Processing headers",
-        "Creating template",
-        "Filling article information",
-        "Transforming data",
-        "Processing SD data",
-        "Validating finished products", 
-        "Processing final document"
-    ]
+    total_steps = len(PIPELINE_STEPS)
+    st.session_state.pop("pipeline_traceback", None)
     
-    total_steps = len(steps)
+    try:
+        pipeline = start_pipeline_import().result()
+    except Exception as e:  # Importing runs module-level code, which can raise anything
+        logger.exception("Pipeline modules failed to load")
+        start_pipeline_import.clear()
+        st.session_state["pipeline_traceback"] = traceback.TracebackException.from_exception(e)
+        return None, f"Processing Error: {str(e)}"
     
     try:
-        # Create temporary directory for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_dir = Path(temp_dir)
-            
-            # Save uploaded file
-            input_file = temp_dir / uploaded_file.name
-            with open(input_file, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            
-            # Track outputs
-            outputs = {}
-            current_step = 0
-            
-            # Step 0: Validation
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            
-            if not validate_before_pipeline(input_file, verbose=False):
-                raise ValidationError("Input file validation failed")
-            
-            current_step += 1
-            
-            # Step 1: Unmerge cells
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            unmerger = ExcelUnmerger(str(temp_dir))
-            outputs['step1'] = unmerger.unmerge_file(input_file)
-            current_step += 1
-            
-            # Step 2: Header processing
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            processor = HeaderProcessor(str(temp_dir))
-            outputs['step2'] = processor.process_file(outputs['step1'])
-            current_step += 1
-            
-            # Step 3: Template creation
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            creator = TemplateCreator(str(temp_dir))
-            outputs['step3'] = creator.create_template(outputs['step2'])
-            current_step += 1
-            
-            # Step 4: Article filling
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            filler = ArticleFiller(str(temp_dir))
-            outputs['step4'] = filler.fill_article_info(input_file, outputs['step3'])
-            current_step += 1
-            
-            # Step 5: Data transformation
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            transformer = DataTransformer(str(temp_dir))
-            outputs['step5'] = transformer.transform_data(outputs['step2'], outputs['step4'])
-            current_step += 1
-            
-            # Step 6: SD processing
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            sd_processor = SDProcessor(str(temp_dir))
-            outputs['step6'] = sd_processor.process_sd_data(outputs['step2'], step4_file=outputs['step5'])
-            current_step += 1
-            
-            # Step 7: Finished product validation
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            product_processor = FinishedProductProcessor(str(temp_dir))
-            outputs['step7'] = product_processor.process_finished_products(input_file, step6_file=outputs['step6'])
-            current_step += 1
-            
-            # Step 8: Final document processing
-            update_progress(progress_placeholder, status_placeholder, current_step, total_steps, steps[current_step])
-            doc_processor = DocumentProcessor(str(temp_dir))
-            outputs['step8'] = doc_processor.process_document(input_file, step7_file=outputs['step7'])
+        file_hash = hash_uploaded_file(uploaded_file)
+        
+        # Run the steps on a worker thread; the script thread only renders progress.
+        # Streamlit elements must be updated from the script thread, so the worker
+        # reports step indices through a queue instead of touching placeholders.
+        progress_queue = queue.Queue()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(convert_upload, file_hash, uploaded_file.name,
+                                     uploaded_file, pipeline, progress_queue.put)
             
-            # Complete
-            update_progress(progress_placeholder, status_placeholder, total_steps, total_steps, "Processing complete!")
+            # Coalesce updates: render at most once per PROGRESS_MIN_INTERVAL, always
+            # showing the latest step (the final state is drawn unconditionally below)
+            pending_step = None
+            last_emit = 0.0
+            while True:
+                try:
+                    pending_step = progress_queue.get(timeout=PROGRESS_POLL_INTERVAL)
+                except queue.Empty:
+                    if future.done() and progress_queue.empty():
+                        break
+                
+                now = time.monotonic()
+                if pending_step is not None and now - last_emit >= PROGRESS_MIN_INTERVAL:
+                    update_progress(progress_placeholder, pending_step, total_steps, PIPELINE_STEPS[pending_step])
+                    pending_step = None
+                    last_emit = now
             
-            return outputs['step8'], None
+            result_file = future.result()
+        
+        # Complete
+        update_progress(progress_placeholder, total_steps, total_steps, "Processing complete!")
+        
+        return result_file, None
             
-    except ValidationError as e:
+    except pipeline["ValidationError"] as e:
         return None, f"Validation Error: {str(e)}"
     except Exception as e:
-        return None, f"Processing Error: {str(e)}\n\nDetails:\n{traceback.format_exc()}"
+        # Full traceback goes to the server log; the UI formats it only when showing details.
+        # TracebackException keeps the text needed for that, not the frames and their locals.
+        logger.exception("Pipeline processing failed")
+        st.session_state["pipeline_traceback"] = traceback.TracebackException.from_exception(e)
+        return None, f"Processing Error: {str(e)}"
 
-def update_progress(progress_placeholder, status_placeholder, current, total, status):
-    """Update progress bar and status"""
+def update_progress(progress_placeholder, current, total, status):
+    """Update progress bar and status in a single placeholder render"""
     progress = current / total
     
     with progress_placeholder.container():
-        st.markdown(f"""
-        <div class="progress-bar">
-            <div class="progress-fill" style="width: {progress * 100}%"></div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.progress(progress)
-    
-    with status_placeholder.container():
         st.markdown(f"""
         <div class="step-indicator">
             <div class="step-number {'step-completed' if current >= total else 'step-current'}">{current}</div>
             <span>{status}</span>
         </div>
         """, unsafe_allow_html=True)
+        
+        st.progress(progress)
+
+# Only this section reruns on its own widget events (the button, the details
+# expander, the download), so they do not re-execute the header and uploader
+@st.fragment
+def show_conversion_section(uploaded_file):
+    """Display the convert button, pipeline progress and download section"""
+    # Process button
+    if st.button("🚀 Start Conversion", type="primary"):
+        
+        # Progress tracking
+        progress_placeholder = st.empty()
+        
+        # Process the pipeline
+        with st.spinner("Processing your file..."):
+            result_file, error = process_pipeline(uploaded_file, progress_placeholder)
+        
+        if error:
+            st.markdown(f"""
+            <div class="error-message">
+                ❌ <strong>Processing Failed</strong><br>
+                {error}
+            </div>
+            """, unsafe_allow_html=True)
+            
+            pipeline_traceback = st.session_state.get("pipeline_traceback")
+            if pipeline_traceback:
+                with st.expander("Details"):
+                    st.code("".join(pipeline_traceback.format()))
+        else:
+            st.markdown("""
+            <div class="success-message">
+                ✅ <strong>Conversion completed successfully!</strong><br>
+                Your file has been processed through all 8 steps.
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Download section (one stat() checks the cached result still exists and is non-empty)
+            try:
+                result_size = Path(result_file).stat().st_size if result_file else 0
+            except FileNotFoundError:
+                result_size = 0
+            
+            if result_size:
+                # Generate download filename
+                base_name = uploaded_file.name.rsplit('.', 1)[0]
+                download_filename = f"{base_name}-Converted.xlsx"
+                
+                st.markdown("""
+                <div class="download-section">
+                    <h3>📥 Download Your Converted File</h3>
+                    <p>Standard Internal TSS format ready for use</p>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                st.download_button(
+                    label="📥 Download Converted File",
+                    data=partial(Path(result_file).read_bytes),  # read only when clicked
+                    file_name=download_filename,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    type="primary"
+                )
 
 def main():
     """Main application"""
     show_header()
+    start_pipeline_import()
     
     # File upload section
     show_upload_section()
@@ -413,55 +653,7 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
-        # Process button
-        if st.button("🚀 Start Conversion", type="primary"):
-            
-            # Progress tracking
-            progress_placeholder = st.empty()
-            status_placeholder = st.empty()
-            
-            # Process the pipeline
-            with st.spinner("Processing your file..."):
-                result_file, error = process_pipeline(uploaded_file, progress_placeholder, status_placeholder)
-            
-            if error:
-                st.markdown(f"""
-                <div class="error-message">
-                    ❌ <strong>Processing Failed</strong><br>
-                    {error}
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown("""
-                <div class="success-message">
-                    ✅ <strong>Conversion completed successfully!</strong><br>
-                    Your file has been processed through all 8 steps.
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Download section
-                if result_file and os.path.exists(result_file):
-                    with open(result_file, "rb") as f:
-                        result_data = f.read()
-                    
-                    # Generate download filename
-                    base_name = uploaded_file.name.rsplit('.', 1)[0]
-                    download_filename = f"{base_name}-Converted.xlsx"
-                    
-                    st.markdown("""
-                    <div class="download-section">
-                        <h3>📥 Download Your Converted File</h3>
-                        <p>Standard Internal TSS format ready for use</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.download_button(
-                        label="📥 Download Converted File",
-                        data=result_data,
-                        file_name=download_filename,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        type="primary"
-                    )
+        show_conversion_section(uploaded_file)
     
     # Footer
     st.markdown("""
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Batch Utilities for SEDO TSS Converter Pipeline
+Runs a step over several input files for the step scripts' batch mode
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def process_files_in_parallel(process_file: Callable[[Path], str], input_files: List[Path],
+                              jobs: Optional[int] = 1, step_logger=None) -> List[str]:
+    """
+    Run a step's process_file on each input file, in worker processes when jobs > 1
+    
+    Files are independent and openpyxl load/save is CPU-bound Python, so batches
+    can fan out across processes (threads would serialize on the GIL). process_file
+    must be picklable, e.g. a bound method of a processor built from plain paths.
+    A file that fails is logged and left out of the results.
+    
+    Args:
+        process_file: Callable taking an input file and returning its output path
+        input_files: Files to process
+        jobs: Number of worker processes (1 or None = serial, 0 = one per CPU)
+        step_logger: Optional logger for per-file results (defaults to this module's)
+    
+    Returns:
+        Output file paths, in the order of input_files
+    """
+    log = step_logger or logger
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs or 1, len(input_files))
+    results = []
+    
+    def collect(input_file, get_result):
+        try:
+            result = get_result()
+            results.append(result)
+            log.info(f"✅ Processed: {input_file} → {result}")
+        except Exception as e:
+            log.error(f"❌ Failed to process {input_file}: {e}")
+    
+    if jobs <= 1:
+        for input_file in input_files:
+            collect(input_file, partial(process_file, input_file))
+        return results
+    
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(process_file, input_file) for input_file in input_files]
+        for input_file, future in zip(input_files, futures):
+            collect(input_file, future.result)
+    
+    return results
@@ -4,66 +4,99 @@ Deployment helper script for Streamlit app
 Run this to test the app locally before deploying
 """
 
+import importlib.metadata
+import importlib.util
 import subprocess
 import sys
 import os
 from pathlib import Path
 
+# (display name, module/distribution, install hint); checked with find_spec and
+# package metadata, so nothing is imported just to print its version. The app's own
+# modules are imported for real, once, in a child process (see test_imports)
+DEPENDENCIES = [
+    ("Streamlit", "streamlit", "pip install streamlit>=1.52.0"),
+    ("openpyxl", "openpyxl", "pip install openpyxl>=3.1.0"),
+    ("pandas", "pandas", "pip install pandas>=2.1.0"),
+]
+
+VALIDATION_MODULES = ["validation_utils", "pipeline_validator"]
+
+PIPELINE_MODULES = [
+    "step1_unmerge_standalone",
+    "step2_header_processing",
+    "step3_template_creation",
+    "step4_article_filling",
+    "step5_data_transformation",
+    "step6_sd_processing",
+    "step7_finished_product",
+    "step8_document_processing",
+]
+
+# Run in the child process: import each module named in argv, in order, reporting
+# the first failure as "<module>: <error>" on stderr
+IMPORT_CHECK_SCRIPT = """
+import importlib, sys
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except Exception as e:
+        sys.exit(f"{name}: {type(e).__name__}: {e}")
+"""
+
 def check_dependencies():
     """Check if all required dependencies are installed"""
     print("🔍 Checking dependencies...")
     
-    try:
-        import streamlit
-        print(f"✅ Streamlit {streamlit.__version__}")
-    except ImportError:
-        print("❌ Streamlit not installed")
-        print("💡 Install with: pip install streamlit>=1.28.0")
-        return False
+    for name, module, install_hint in DEPENDENCIES:
+        if importlib.util.find_spec(module) is None:
+            print(f"❌ {name} not installed")
+            print(f"💡 Install with: {install_hint}")
+            return False
+        print(f"✅ {name} {importlib.metadata.version(module)}")
     
-    try:
-        import openpyxl
-        print(f"✅ openpyxl {openpyxl.__version__}")
-    except ImportError:
-        print("❌ openpyxl not installed") 
-        print("💡 Install with: pip install openpyxl>=3.1.0")
-        return False
+    return True
+
+def import_error(module_names):
+    """
+    Import the modules in one child process and return the first failure, or None
     
-    try:
-        import pandas as pd
-        print(f"✅ pandas {pd.__version__}")
-    except ImportError:
-        print("❌ pandas not installed")
-        print("💡 Install with: pip install pandas>=2.1.0")
-        return False
+    A real import catches syntax errors and missing dependencies inside the
+    modules, while this process (later replaced by the server) stays small.
     
-    return True
+    Returns:
+        (module name, error message) for the first module that failed, or None
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_CHECK_SCRIPT, *module_names],
+        cwd=Path(__file__).resolve().parent, capture_output=True, text=True
+    )
+    if result.returncode == 0:
+        return None
+    last_line = result.stderr.strip().rpartition("\n")[2]
+    module, _, message = last_line.partition(": ")
+    if not message:  # Died without reporting (e.g. killed by a signal)
+        return "", last_line or f"exit code {result.returncode}"
+    return module, message
 
 def test_imports():
     """Test all application imports"""
     print("\n🧪 Testing application imports...")
     
-    try:
-        from validation_utils import ValidationError
-        from pipeline_validator import validate_before_pipeline
-        print("✅ Validation modules")
-    except ImportError as e:
-        print(f"❌ Validation import error: {e}")
+    # One child process imports everything: the validation modules first (the step
+    # modules import them anyway, so they are not loaded twice), then the steps
+    error = import_error(VALIDATION_MODULES + PIPELINE_MODULES)
+    failed_module = error[0] if error else None
+    
+    if failed_module in VALIDATION_MODULES:
+        print(f"❌ Validation import error: {error[1]}")
         return False
+    print("✅ Validation modules")
     
-    try:
-        from step1_unmerge_standalone import ExcelUnmerger
-        from step2_header_processing import HeaderProcessor
-        from step3_template_creation import TemplateCreator
-        from step4_article_filling import ArticleFiller
-        from step5_data_transformation import DataTransformer
-        from step6_sd_processing import SDProcessor
-        from step7_finished_product import FinishedProductProcessor
-        from step8_document_processing import DocumentProcessor
-        print("✅ Pipeline modules")
-    except ImportError as e:
-        print(f"❌ Pipeline import error: {e}")
+    if error:
+        print(f"❌ Pipeline import error: {error[1]}")
         return False
+    print("✅ Pipeline modules")
     
     return True
 
@@ -73,19 +106,18 @@ def run_local_server():
     print("📱 App will be available at: http://localhost:8501")
     print("🛑 Press Ctrl+C to stop the server")
     
+    # Hand this process over to the server (exec, not a child process) so the
+    # helper and everything it imported during the checks do not stay resident
+    sys.stdout.flush()
     try:
-        subprocess.run([
+        os.execv(sys.executable, [
             sys.executable, "-m", "streamlit", "run", "app.py",
             "--server.headless", "false",
             "--browser.gatherUsageStats", "false"
-        ], check=True)
-    except KeyboardInterrupt:
-        print("\n👋 Server stopped by user")
-    except subprocess.CalledProcessError as e:
+        ])
+    except OSError as e:
         print(f"❌ Failed to start server: {e}")
         return False
-    
-    return True
 
 def show_deployment_info():
     """Show deployment information"""
@@ -108,6 +140,7 @@ def show_deployment_info():
     print("   ✅ app.py (main application)")
     print("   ✅ requirements.txt (dependencies)")
     print("   ✅ .streamlit/config.toml (configuration)")
+    print("   ✅ assets/app.css (styling)")
     print("   ✅ All step*.py files (pipeline)")
     print("   ✅ validation_utils.py & pipeline_validator.py")
     print()
@@ -4,8 +4,9 @@ Pipeline Pre-flight Validator for SEDO TSS Converter
 Comprehensive validation before starting any processing steps
 """
 
-import openpyxl
 import logging
+import shutil
+from datetime import datetime
 from pathlib import Path
 from typing import Union, Optional, List, Dict, Tuple
 import sys
@@ -14,6 +15,17 @@ from validation_utils import ValidationError, FileValidator, HeaderDetector, Err
 
 logger = logging.getLogger(__name__)
 
+# HeaderDetector searches at most the first 50 rows
+HEADER_SEARCH_ROWS = 50
+
+# Report icon per validation status
+STATUS_ICONS = {
+    'PASSED': '✅',
+    'WARNING': '⚠️',
+    'INFO': 'ℹ️',
+    'FAILED': '❌'
+}
+
 class PipelineValidator:
     """
     Comprehensive pipeline validation before execution starts
@@ -45,11 +57,16 @@ class PipelineValidator:
         # Stage 1: Basic file validation
         self._validate_input_file(input_path)
         
-        # Stage 2: Excel structure validation  
-        excel_stats = self._validate_excel_structure(input_path)
-        
-        # Stage 3: Step-specific requirements validation (reuse loaded workbook)
-        self._validate_step_requirements(input_path, excel_stats)
+        # Stages 2 and 3 share one read-only workbook load
+        workbook = FileValidator.load_workbook_read_only(input_path)
+        try:
+            # Stage 2: Excel structure validation  
+            excel_stats = self._validate_excel_structure(input_path, workbook)
+            
+            # Stage 3: Step-specific requirements validation (reuse loaded workbook)
+            self._validate_step_requirements(input_path, workbook, excel_stats)
+        finally:
+            workbook.close()
         
         # Stage 4: System resources validation
         self._validate_system_resources()
@@ -60,23 +77,26 @@ class PipelineValidator:
             'input_file': str(input_path),
             'excel_stats': excel_stats,
             'validation_results': self.validation_results,
-            'timestamp': __import__('datetime').datetime.now().isoformat()
+            'timestamp': datetime.now().isoformat()
         }
         
         logger.info("✅ Pipeline validation completed successfully")
         return report
     
+    def _add_result(self, stage: str, status: str, message: str, details: Optional[Dict[str, any]] = None):
+        """Record one stage outcome in the report (plain dicts: the report is returned to callers)"""
+        result = {'stage': stage, 'status': status, 'message': message}
+        if details is not None:
+            result['details'] = details
+        self.validation_results.append(result)
+    
     def _validate_input_file(self, input_path: Path):
         """Stage 1: Basic file validation"""
         logger.debug("Stage 1: Basic file validation")
         
         try:
             FileValidator.validate_input_file(input_path)
-            self.validation_results.append({
-                'stage': 'file_validation',
-                'status': 'PASSED',
-                'message': f'File validation passed: {input_path.name}'
-            })
+            self._add_result('file_validation', 'PASSED', f'File validation passed: {input_path.name}')
         except Exception as e:
             raise ValidationError(
                 f"Critical file validation failed: {str(e)}",
@@ -91,12 +111,12 @@ class PipelineValidator:
                 step="Pre-flight"
             )
     
-    def _validate_excel_structure(self, input_path: Path) -> Dict[str, any]:
+    def _validate_excel_structure(self, input_path: Path, workbook) -> Dict[str, any]:
         """Stage 2: Excel structure validation"""
         logger.debug("Stage 2: Excel structure validation")
         
         try:
-            stats = FileValidator.validate_excel_structure(input_path)
+            stats = FileValidator.validate_excel_structure(input_path, workbook)
             
             # Additional structure checks
             if stats['max_row'] < 15:
@@ -127,12 +147,9 @@ class PipelineValidator:
                     step="Pre-flight"
                 )
             
-            self.validation_results.append({
-                'stage': 'excel_structure',
-                'status': 'PASSED',
-                'message': f'Excel structure valid: {stats["max_row"]} rows, {stats["max_col"]} cols',
-                'details': stats
-            })
+            self._add_result('excel_structure', 'PASSED',
+                             f'Excel structure valid: {stats["max_row"]} rows, {stats["max_col"]} cols',
+                             details=stats)
             
             return stats
             
@@ -152,33 +169,25 @@ class PipelineValidator:
                 step="Pre-flight"
             )
     
-    def _validate_step_requirements(self, input_path: Path, excel_stats: Dict[str, any] = None):
+    def _validate_step_requirements(self, input_path: Path, workbook, excel_stats: Dict[str, any] = None):
         """Stage 3: Step-specific requirements validation"""
         logger.debug("Stage 3: Step-specific requirements validation")
         
         try:
-            # Load workbook for header checks (not read-only to access merged_cells)
-            # Note: This is separate from the read-only validation in Stage 2
-            wb = openpyxl.load_workbook(str(input_path), read_only=False)
-            ws = wb.active
+            # The workbook is read-only: merged ranges are counted from the sheet XML
+            # and the header checks scan the values of the first HEADER_SEARCH_ROWS
+            # rows, read once, so the full cell grid and styles are never built
+            merged_ranges = FileValidator.count_merged_ranges(workbook.active, input_path)
+            header_rows = list(workbook.active.iter_rows(max_row=HEADER_SEARCH_ROWS, values_only=True))
             
             # Step 1 requirements: Check for merged cells (informational)
-            merged_ranges = len(list(ws.merged_cells.ranges))
             if merged_ranges == 0:
-                self.validation_results.append({
-                    'stage': 'step1_check',
-                    'status': 'INFO',
-                    'message': 'No merged cells found - Step 1 will complete quickly'
-                })
+                self._add_result('step1_check', 'INFO', 'No merged cells found - Step 1 will complete quickly')
             else:
-                self.validation_results.append({
-                    'stage': 'step1_check', 
-                    'status': 'PASSED',
-                    'message': f'Found {merged_ranges} merged ranges for processing'
-                })
+                self._add_result('step1_check', 'PASSED', f'Found {merged_ranges} merged ranges for processing')
             
             # Step 2 requirements: Check for General Type header
-            header_result = HeaderDetector.find_general_type_header(ws)
+            header_result = HeaderDetector.find_general_type_header(header_rows)
             if header_result is None:
                 raise ValidationError(
                     "Required 'General Type/Sub-Type in Connect' header not found",
@@ -195,29 +204,15 @@ class PipelineValidator:
                 )
             else:
                 row, col, matched_text = header_result
-                self.validation_results.append({
-                    'stage': 'step2_check',
-                    'status': 'PASSED',
-                    'message': f'General Type header found: "{matched_text}" at row {row}'
-                })
+                self._add_result('step2_check', 'PASSED', f'General Type header found: "{matched_text}" at row {row}')
             
             # Step 4 requirements: Check for Article headers  
-            article_headers = HeaderDetector.find_article_headers(ws)
+            article_headers = HeaderDetector.find_article_headers(header_rows)
             if article_headers is None:
-                self.validation_results.append({
-                    'stage': 'step4_check',
-                    'status': 'WARNING',
-                    'message': 'Article Name/Number headers not found - will create template without articles'
-                })
+                self._add_result('step4_check', 'WARNING', 'Article Name/Number headers not found - will create template without articles')
             else:
                 name_col, no_col, header_row = article_headers
-                self.validation_results.append({
-                    'stage': 'step4_check',
-                    'status': 'PASSED',
-                    'message': f'Article headers found at row {header_row}: Name col {name_col}, Number col {no_col}'
-                })
-            
-            wb.close()
+                self._add_result('step4_check', 'PASSED', f'Article headers found at row {header_row}: Name col {name_col}, Number col {no_col}')
             
         except ValidationError:
             raise  # Re-raise our validation errors
@@ -239,76 +234,58 @@ class PipelineValidator:
         """Stage 4: System resources validation"""
         logger.debug("Stage 4: System resources validation")
         
-        # Check output directory
+        # Check output directory (a single mkdir: FileExistsError means it is already there)
         output_dir = self.base_dir / "data" / "output"
-        if not output_dir.exists():
-            try:
-                output_dir.mkdir(parents=True, exist_ok=True)
-                self.validation_results.append({
-                    'stage': 'system_resources',
-                    'status': 'INFO',
-                    'message': f'Created output directory: {output_dir}'
-                })
-            except Exception as e:
-                raise ValidationError(
-                    f"Cannot create output directory: {output_dir}",
-                    error_code="OUTPUT_DIR_CREATION_FAILED",
-                    severity=ValidationError.CRITICAL,
-                    category=ValidationError.FILE_ERROR,
-                    suggestions=[
-                        "Check if you have write permissions in the project directory",
-                        "Ensure disk has sufficient space",
-                        "Try running as administrator if necessary"
-                    ],
-                    step="Pre-flight"
-                )
+        try:
+            output_dir.mkdir(parents=True)
+            self._add_result('system_resources', 'INFO', f'Created output directory: {output_dir}')
+        except FileExistsError:
+            pass
+        except Exception as e:
+            raise ValidationError(
+                f"Cannot create output directory: {output_dir}",
+                error_code="OUTPUT_DIR_CREATION_FAILED",
+                severity=ValidationError.CRITICAL,
+                category=ValidationError.FILE_ERROR,
+                suggestions=[
+                    "Check if you have write permissions in the project directory",
+                    "Ensure disk has sufficient space",
+                    "Try running as administrator if necessary"
+                ],
+                step="Pre-flight"
+            )
         
         # Check disk space (warn if < 100MB free)
         try:
-            import shutil
             free_space = shutil.disk_usage(output_dir).free / (1024 * 1024)  # MB
             if free_space < 100:
-                self.validation_results.append({
-                    'stage': 'system_resources',
-                    'status': 'WARNING', 
-                    'message': f'Low disk space: {free_space:.1f}MB free (recommended: >100MB)'
-                })
+                self._add_result('system_resources', 'WARNING', f'Low disk space: {free_space:.1f}MB free (recommended: >100MB)')
             else:
-                self.validation_results.append({
-                    'stage': 'system_resources',
-                    'status': 'PASSED',
-                    'message': f'Sufficient disk space: {free_space:.1f}MB free'
-                })
+                self._add_result('system_resources', 'PASSED', f'Sufficient disk space: {free_space:.1f}MB free')
         except Exception:
             # Disk space check failed, but not critical
-            self.validation_results.append({
-                'stage': 'system_resources',
-                'status': 'INFO',
-                'message': 'Could not check disk space - proceeding anyway'
-            })
+            self._add_result('system_resources', 'INFO', 'Could not check disk space - proceeding anyway')
     
     def print_validation_report(self, report: Dict[str, any]):
         """Print formatted validation report"""
-        print("\n" + "="*60)
-        print("📋 PIPELINE VALIDATION REPORT")
-        print("="*60)
-        print(f"📁 Input File: {report['input_file']}")
-        print(f"📊 File Stats: {report['excel_stats']['max_row']} rows, {report['excel_stats']['max_col']} cols")
-        print(f"⏰ Validation Time: {report['timestamp']}")
-        print("\n🔍 Validation Results:")
+        # Build the whole report first and print it with a single write
+        lines = [
+            "\n" + "="*60,
+            "📋 PIPELINE VALIDATION REPORT",
+            "="*60,
+            f"📁 Input File: {report['input_file']}",
+            f"📊 File Stats: {report['excel_stats']['max_row']} rows, {report['excel_stats']['max_col']} cols",
+            f"⏰ Validation Time: {report['timestamp']}",
+            "\n🔍 Validation Results:",
+        ]
         
         for result in report['validation_results']:
-            status_icon = {
-                'PASSED': '✅',
-                'WARNING': '⚠️',
-                'INFO': 'ℹ️',
-                'FAILED': '❌'
-            }.get(result['status'], '•')
-            
-            print(f"  {status_icon} {result['stage']}: {result['message']}")
+            status_icon = STATUS_ICONS.get(result['status'], '•')
+            lines.append(f"  {status_icon} {result['stage']}: {result['message']}")
         
-        print(f"\n🎯 Overall Status: {status_icon} {report['status']}")
-        print("="*60)
+        lines.append(f"\n🎯 Overall Status: {STATUS_ICONS.get(report['status'], '•')} {report['status']}")
+        lines.append("="*60)
+        print("\n".join(lines))
 
 def validate_before_pipeline(input_file: Union[str, Path], verbose: bool = False) -> bool:
     """
@@ -21,6 +21,7 @@ import argparse
 import sys
 import re
 from validation_utils import ValidationError, ErrorHandler, handle_validation_error
+from batch_utils import process_files_in_parallel
 from pipeline_validator import validate_before_pipeline
 
 # Configure logging
@@ -37,19 +38,24 @@ class ExcelUnmerger:
     - No complex analysis, just reliable data preservation
     """
     
+    # Output numbering comes from input names like 'input-1.xlsx' / 'Input-1.xlsx'
+    FILE_NUMBER_PATTERN = re.compile(r'[Ii]nput-(\d+)')
+    
     def __init__(self, base_dir: Optional[str] = None):
         self.base_dir = Path(base_dir) if base_dir else Path.cwd()
         self.output_dir = self.base_dir / "data" / "output"
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def unmerge_file(self, input_file: Union[str, Path], 
-                    output_file: Optional[Union[str, Path]] = None) -> str:
+                    output_file: Optional[Union[str, Path]] = None,
+                    skip_preflight: bool = False) -> str:
         """
         Simple & Effective Cell Unmerging
         
         Args:
             input_file: Input Excel file path
             output_file: Optional output file path (if None, auto-generate)
+            skip_preflight: Skip pre-flight validation (caller already validated the input)
             
         Returns:
             Path to unmerged file
@@ -57,16 +63,20 @@ class ExcelUnmerger:
         logger.info("📋 Excel Cell Unmerging - Standalone")
         
         # Pre-flight validation to prevent pipeline failures
-        logger.info("🔍 Running pre-flight validation...")
-        if not validate_before_pipeline(input_file, verbose=True):
-            logger.error("💥 Pre-flight validation failed - pipeline cannot continue")
-            raise ValidationError(
-                "Input validation failed - please fix the issues above and try again",
-                error_code="PREFLIGHT_VALIDATION_FAILED",
-                severity=ValidationError.CRITICAL,
-                category=ValidationError.FILE_ERROR,
-                step="Step 1"
-            )
+        # (skipped when the caller already validated the input, avoiding two extra workbook loads)
+        if skip_preflight:
+            logger.info("⏭️  Skipping pre-flight validation (already validated by caller)")
+        else:
+            logger.info("🔍 Running pre-flight validation...")
+            if not validate_before_pipeline(input_file, verbose=True):
+                logger.error("💥 Pre-flight validation failed - pipeline cannot continue")
+                raise ValidationError(
+                    "Input validation failed - please fix the issues above and try again",
+                    error_code="PREFLIGHT_VALIDATION_FAILED",
+                    severity=ValidationError.CRITICAL,
+                    category=ValidationError.FILE_ERROR,
+                    step="Step 1"
+                )
         
         # Use validated path (pre-flight validation already checked file)
         input_path = Path(input_file)
@@ -106,51 +116,54 @@ class ExcelUnmerger:
         
         logger.info(f"Found {total_merges} merged ranges to process")
         
-        # Step 1: Efficient value collection
-        value_map = {}
+        # Single pass per range: read the top-left value, unmerge, then fill the
+        # freed cells straight away (no intermediate map of every merged cell)
+        unmerged_count = 0
+        failed_unmerges = []
         processed_cells = 0
+        filled_count = 0
         
         for merge_range in merged_ranges:
             min_col, min_row, max_col, max_row = merge_range.bounds
             top_left_value = ws.cell(min_row, min_col).value
+            processed_cells += (max_row - min_row + 1) * (max_col - min_col + 1)
             
-            # Map all cells in range to the top-left value
-            for row in range(min_row, max_row + 1):
-                for col in range(min_col, max_col + 1):
-                    value_map[(row, col)] = top_left_value
-                    processed_cells += 1
-        
-        logger.info(f"Collected values for {processed_cells} cells from {total_merges} ranges")
-        
-        # Step 2: Unmerge all ranges
-        unmerged_count = 0
-        failed_unmerges = []
-        
-        for merge_range in merged_ranges:
             try:
-                ws.unmerge_cells(str(merge_range))
+                # Pass the bounds already in hand rather than str(merge_range),
+                # which unmerge_cells would only parse back into the same bounds
+                ws.unmerge_cells(start_row=min_row, start_column=min_col,
+                                 end_row=max_row, end_column=max_col)
                 unmerged_count += 1
             except Exception as e:
                 failed_unmerges.append((merge_range, str(e)))
-                logger.warning(f"Failed to unmerge {merge_range}: {e}")
+                logger.warning("Failed to unmerge %s: %s", merge_range, e)
+                continue
+            
+            if top_left_value is None:
+                continue
+            
+            # unmerge_cells drops every cell but the top-left, so the rest of the
+            # range comes back as fresh empty cells: write them unconditionally
+            # and skip the top-left itself
+            range_rows = ws.iter_rows(min_row=min_row, max_row=max_row,
+                                      min_col=min_col, max_col=max_col)
+            for cell in next(range_rows)[1:]:
+                cell.value = top_left_value
+            for row_cells in range_rows:
+                for cell in row_cells:
+                    cell.value = top_left_value
+            filled_count += (max_row - min_row + 1) * (max_col - min_col + 1) - 1
         
         logger.info(f"✅ Unmerged {unmerged_count}/{total_merges} ranges successfully")
         if failed_unmerges:
             logger.warning(f"❌ {len(failed_unmerges)} ranges failed to unmerge")
         
-        # Step 3: Fill all cells with preserved values
-        filled_count = 0
-        for (row, col), value in value_map.items():
-            cell = ws.cell(row, col)
-            if cell.value is None and value is not None:
-                cell.value = value
-                filled_count += 1
-        
         logger.info(f"✅ Filled {filled_count} empty cells with preserved values")
         
         # Calculate and log efficiency
-        fill_rate = (filled_count / processed_cells) * 100 if processed_cells > 0 else 0
-        logger.info(f"📊 Data preservation: {fill_rate:.1f}% ({filled_count}/{processed_cells} cells)")
+        if logger.isEnabledFor(logging.INFO):
+            fill_rate = (filled_count / processed_cells) * 100 if processed_cells > 0 else 0
+            logger.info("📊 Data preservation: %.1f%% (%d/%d cells)", fill_rate, filled_count, processed_cells)
         
         # Save result with enhanced error handling
         try:
@@ -165,45 +178,44 @@ class ExcelUnmerger:
     
     def _extract_file_number(self, filename: str) -> str:
         """Extract file number from filename like 'input-1.xlsx' or 'Input-1.xlsx'"""
-        match = re.search(r'[Ii]nput-(\d+)', filename)
+        if 'nput-' not in filename:
+            return ""
+        match = self.FILE_NUMBER_PATTERN.search(filename)
         return match.group(1) if match else ""
     
-    def unmerge_multiple_files(self, input_patterns: list, output_dir: Optional[str] = None) -> list:
+    def unmerge_multiple_files(self, input_patterns: list, output_dir: Optional[str] = None,
+                               jobs: Optional[int] = 1) -> list:
         """
         Unmerge multiple files matching patterns
         
         Args:
             input_patterns: List of file patterns or paths
             output_dir: Output directory (if None, use default)
+            jobs: Number of worker processes (1 = serial, 0 = one per CPU)
             
         Returns:
-            List of output file paths
+            List of output file paths, in input order
         """
         if output_dir:
             self.output_dir = Path(output_dir)
             self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        results = []
+        input_files = []
         
         for pattern in input_patterns:
             # Handle glob patterns
             if '*' in str(pattern):
-                input_files = list(self.base_dir.glob(str(pattern)))
+                matched_files = list(self.base_dir.glob(str(pattern)))
             else:
-                input_files = [Path(pattern)]
+                matched_files = [Path(pattern)]
             
-            for input_file in input_files:
+            for input_file in matched_files:
                 if input_file.exists() and input_file.suffix.lower() in ['.xlsx', '.xls']:
-                    try:
-                        result = self.unmerge_file(input_file)
-                        results.append(result)
-                        logger.info(f"✅ Processed: {input_file} → {result}")
-                    except Exception as e:
-                        logger.error(f"❌ Failed to process {input_file}: {e}")
+                    input_files.append(input_file)
                 else:
                     logger.warning(f"⚠️  Skipped: {input_file} (not found or not Excel file)")
         
-        return results
+        return process_files_in_parallel(self.unmerge_file, input_files, jobs, logger)
 
 def main():
     """Command line interface for standalone unmerging"""
@@ -213,6 +225,8 @@ def main():
     parser.add_argument('-d', '--base-dir', help='Base directory', default='.')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose logging')
     parser.add_argument('--batch', action='store_true', help='Batch mode for multiple files')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes for batch mode (default: 1, serial; 0 = one per CPU)')
     
     args = parser.parse_args()
     
@@ -227,7 +241,7 @@ def main():
         if args.batch or len(args.input) > 1:
             # Multiple files mode
             output_dir = args.output if args.output else None
-            results = unmerger.unmerge_multiple_files(args.input, output_dir)
+            results = unmerger.unmerge_multiple_files(args.input, output_dir, args.jobs)
             
             print("\n📊 Batch Processing Results:")
             print(f"✅ Successfully processed: {len(results)} files")
@@ -16,6 +16,7 @@ OUTPUT: Header-processed file (data/output/output-X-Step2.xlsx)
 """
 
 import openpyxl
+from openpyxl.utils import get_column_letter
 import logging
 from pathlib import Path
 from typing import Union, Optional, Tuple
@@ -23,6 +24,7 @@ import argparse
 import sys
 import re
 from validation_utils import ValidationError, ErrorHandler, HeaderDetector, handle_validation_error
+from batch_utils import process_files_in_parallel
 from pipeline_validator import validate_before_pipeline
 
 # Configure logging
@@ -45,13 +47,15 @@ class HeaderProcessor:
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def process_file(self, input_file: Union[str, Path], 
-                    output_file: Optional[Union[str, Path]] = None) -> str:
+                    output_file: Optional[Union[str, Path]] = None,
+                    skip_preflight: bool = False) -> str:
         """
         Process header rows with 3-case logic
         
         Args:
             input_file: Input file from Step 1 (output-X-Step1.xlsx)
             output_file: Optional output file path (if None, auto-generate)
+            skip_preflight: Skip pre-flight validation (caller already validated the input)
             
         Returns:
             Path to processed file
@@ -59,16 +63,20 @@ class HeaderProcessor:
         logger.info("📋 Step 2: Header Processing with 3-Case Logic")
         
         # Pre-flight validation to prevent pipeline failures
-        logger.info("🔍 Running pre-flight validation...")
-        if not validate_before_pipeline(input_file, verbose=True):
-            logger.error("💥 Pre-flight validation failed - pipeline cannot continue")
-            raise ValidationError(
-                "Input validation failed - please fix the issues above and try again",
-                error_code="PREFLIGHT_VALIDATION_FAILED",
-                severity=ValidationError.CRITICAL,
-                category=ValidationError.FILE_ERROR,
-                step="Step 2"
-            )
+        # (skipped when the caller already validated the input, avoiding two extra workbook loads)
+        if skip_preflight:
+            logger.info("⏭️  Skipping pre-flight validation (already validated by caller)")
+        else:
+            logger.info("🔍 Running pre-flight validation...")
+            if not validate_before_pipeline(input_file, verbose=True):
+                logger.error("💥 Pre-flight validation failed - pipeline cannot continue")
+                raise ValidationError(
+                    "Input validation failed - please fix the issues above and try again",
+                    error_code="PREFLIGHT_VALIDATION_FAILED",
+                    severity=ValidationError.CRITICAL,
+                    category=ValidationError.FILE_ERROR,
+                    step="Step 2"
+                )
         
         # Use validated path (pre-flight validation already checked file)
         input_path = Path(input_file)
@@ -106,7 +114,7 @@ class HeaderProcessor:
             raise ValidationError(error_msg)
         
         header_row, header_col, matched_text = header_result
-        logger.info(f"Found header: '{matched_text}' at row {header_row}, column {chr(64+header_col)}")
+        logger.info(f"Found header: '{matched_text}' at row {header_row}, column {get_column_letter(header_col)}")
         
         logger.info(f"Found header row: {header_row}")
         
@@ -114,7 +122,7 @@ class HeaderProcessor:
         start_col = 10  # Column J
         last_data_col = self._find_last_data_column(ws, header_row)
         
-        logger.info(f"Processing columns {chr(64+start_col)} to {chr(64+last_data_col)} (columns {start_col}-{last_data_col})")
+        logger.info(f"Processing columns {get_column_letter(start_col)} to {get_column_letter(last_data_col)} (columns {start_col}-{last_data_col})")
         logger.info(f"Processing rows {header_row+1} to {header_row+3}")
         
         # Step 3: Apply 3-case logic to all columns
@@ -133,34 +141,15 @@ class HeaderProcessor:
         
         return str(output_file)
     
-    def _find_header_row(self, worksheet) -> Optional[int]:
-        """Find row containing 'General Type/Sub-Type in Connect' (case-insensitive)"""
-        max_row = worksheet.max_row
-        max_col = worksheet.max_column
-        
-        # Search entire worksheet for "General Type/Sub-Type in Connect" or "General Type of Material in Connect"
-        target_texts = ["general type/sub-type in connect", "general type of material in connect"]
-        
-        for row in range(1, max_row + 1):
-            for col in range(1, max_col + 1):
-                cell_value = worksheet.cell(row, col).value
-                if cell_value and isinstance(cell_value, str):
-                    cell_text = cell_value.strip().lower()
-                    if any(target in cell_text for target in target_texts):
-                        logger.debug(f"Found header text at row {row}, column {chr(64+col)}")
-                        return row
-        
-        return None
-    
     def _find_oldest_tr_date_column(self, worksheet, header_row: int) -> Optional[int]:
         """Find column containing 'Oldest TR date' in the header row (n)"""
-        max_col = worksheet.max_column
+        # Read the header row's values in one pass instead of a ws.cell() lookup per column
+        header_values = next(worksheet.iter_rows(min_row=header_row, max_row=header_row, values_only=True))
         
-        for col in range(1, max_col + 1):
-            cell_value = worksheet.cell(header_row, col).value
+        for col, cell_value in enumerate(header_values, start=1):
             if cell_value and isinstance(cell_value, str):
                 if "oldest tr date" in cell_value.lower().strip():
-                    logger.debug(f"Found 'Oldest TR date' at column {chr(64+col)} (column {col})")
+                    logger.debug("Found 'Oldest TR date' at column %s (column %d)", get_column_letter(col), col)
                     return col
         
         return None
@@ -173,17 +162,22 @@ class HeaderProcessor:
         if oldest_tr_col and oldest_tr_col > 1:
             # Return column before 'Oldest TR date'
             last_col = oldest_tr_col - 1
-            logger.debug(f"Last data column based on 'Oldest TR date': {chr(64+last_col)} (column {last_col})")
+            logger.debug("Last data column based on 'Oldest TR date': %s (column %d)", get_column_letter(last_col), last_col)
             return last_col
         
-        # Fallback: Start from reasonable right boundary and work backwards
-        for col in range(worksheet.max_column, 0, -1):
-            # Check if any cell in this column has data
-            for row in range(1, min(worksheet.max_row + 1, 50)):  # Check first 50 rows
-                cell_value = worksheet.cell(row, col).value
+        # Fallback: rightmost column with data in the first 50 rows, reading each row's
+        # values once and only checking columns right of the best found so far
+        last_col = 0
+        for row_values in worksheet.iter_rows(max_row=min(worksheet.max_row, 49), values_only=True):
+            for col in range(len(row_values), last_col, -1):
+                cell_value = row_values[col - 1]
                 if cell_value and str(cell_value).strip():
-                    logger.debug(f"Last data column found (fallback): {chr(64+col)} (column {col})")
-                    return col
+                    last_col = col
+                    break
+        
+        if last_col:
+            logger.debug("Last data column found (fallback): %s (column %d)", get_column_letter(last_col), last_col)
+            return last_col
         
         # Final fallback to max_column if no data found
         return worksheet.max_column
@@ -203,19 +197,18 @@ class HeaderProcessor:
             Number of columns processed
         """
         processed_count = 0
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        # Read rows n+1, n+2, n+3 for the whole column range in one pass and
+        # normalize each row's values in bulk
+        row1, row2, row3 = (
+            map(self._normalize_value, row_values)
+            for row_values in worksheet.iter_rows(min_row=header_row + 1, max_row=header_row + 3,
+                                                  min_col=start_col, max_col=end_col, values_only=True)
+        )
         
         # Process each column from J to last data column
-        for col in range(start_col, end_col + 1):
-            # Get values from 3 rows: n+1, n+2, n+3
-            val1 = worksheet.cell(header_row + 1, col).value  # Row n+1
-            val2 = worksheet.cell(header_row + 2, col).value  # Row n+2  
-            val3 = worksheet.cell(header_row + 3, col).value  # Row n+3
-            
-            # Normalize values for processing
-            val1_str = self._normalize_value(val1)
-            val2_str = self._normalize_value(val2)
-            val3_str = self._normalize_value(val3)
-            
+        for col, val1_str, val2_str, val3_str in zip(range(start_col, end_col + 1), row1, row2, row3):
             # Apply 3-case logic
             new_val1, new_val2, new_val3 = self._apply_three_case_logic(val1_str, val2_str, val3_str)
             
@@ -227,26 +220,20 @@ class HeaderProcessor:
             if new_val3 != val3_str:
                 worksheet.cell(header_row + 3, col).value = new_val3 if new_val3 else None
             
-            # Log changes for debugging (only for first few columns)
-            if col <= start_col + 3:  # Log first 4 columns for debugging
+            # Log changes for debugging (only for first few columns, and only when DEBUG is on)
+            if debug_enabled and col <= start_col + 3:  # Log first 4 columns for debugging
                 change_indicator = ""
                 if (new_val1, new_val2, new_val3) != (val1_str, val2_str, val3_str):
                     change_indicator = " [CHANGED]"
-                logger.debug(f"Column {chr(64+col)}: val16='{val1_str}' val17='{val2_str}' val18='{val3_str}' → val16='{new_val1}' val17='{new_val2}' val18='{new_val3}'{change_indicator}")
+                logger.debug(f"Column {get_column_letter(col)}: val16='{val1_str}' val17='{val2_str}' val18='{val3_str}' → val16='{new_val1}' val17='{new_val2}' val18='{new_val3}'{change_indicator}")
             
             processed_count += 1
         
         return processed_count
     
     def _normalize_value(self, value) -> str:
-        """Normalize cell value to string for comparison"""
-        if value is None:
-            return ""
-        elif isinstance(value, str):
-            return value.strip()
-        else:
-            # Convert other types (datetime, numbers) to string
-            return str(value).strip()
+        """Normalize cell value to string for comparison (other types such as datetimes and numbers via str())"""
+        return "" if value is None else (value if type(value) is str else str(value)).strip()
     
     def _apply_three_case_logic(self, val1: str, val2: str, val3: str) -> Tuple[str, str, str]:
         """
@@ -257,36 +244,26 @@ class HeaderProcessor:
         Case 3: val16 != val17 && val17 != val18 → keep val16, val17 + " " + val18, empty
         
         Args:
-            val1, val2, val3: String values from the 3 rows
+            val1, val2, val3: Values from the 3 rows, already normalized by _normalize_value
             
         Returns:
             Tuple of (new_val1, new_val2, new_val3)
         """
-        # Normalize for comparison (but preserve original formatting for output)
-        norm_val1 = val1.strip() if val1 else ""
-        norm_val2 = val2.strip() if val2 else ""
-        norm_val3 = val3.strip() if val3 else ""
+        # Inputs are already stripped strings, so compare them directly
+        equal_2_3 = val2 == val3
         
         # Case 1: All three values are the same
-        if norm_val1 == norm_val2 == norm_val3 and norm_val1 != "":
+        if equal_2_3 and val1 == val2 and val1:
             return "", val2, ""
         
         # Case 2: First different from second, but second equals third
-        elif norm_val1 != norm_val2 and norm_val2 == norm_val3:
+        elif equal_2_3 and val1 != val2:
             return val1, val2, ""
         
         # Case 3: All different OR first two same but different from third
+        # (combine val2 and val3 with a space, skipping an empty side)
         else:
-            # Combine val2 and val3 with space, handle empty values
-            if norm_val2 and norm_val3:
-                combined_val2 = f"{val2} {val3}".strip()
-            elif norm_val2:
-                combined_val2 = val2
-            elif norm_val3:
-                combined_val2 = val3
-            else:
-                combined_val2 = ""
-            
+            combined_val2 = f"{val2} {val3}" if val2 and val3 else val2 or val3
             return val1, combined_val2, ""
     
     def _extract_file_number(self, filename: str) -> str:
@@ -294,42 +271,39 @@ class HeaderProcessor:
         match = re.search(r'output-(\d+)', filename)
         return match.group(1) if match else ""
     
-    def process_multiple_files(self, input_patterns: list, output_dir: Optional[str] = None) -> list:
+    def process_multiple_files(self, input_patterns: list, output_dir: Optional[str] = None,
+                               jobs: Optional[int] = 1) -> list:
         """
         Process multiple files matching patterns
         
         Args:
             input_patterns: List of file patterns or paths
             output_dir: Output directory (if None, use default)
+            jobs: Number of worker processes (1 = serial, 0 = one per CPU)
             
         Returns:
-            List of output file paths
+            List of output file paths, in input order
         """
         if output_dir:
             self.output_dir = Path(output_dir)
             self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        results = []
+        input_files = []
         
         for pattern in input_patterns:
             # Handle glob patterns
             if '*' in str(pattern):
-                input_files = list(self.base_dir.glob(str(pattern)))
+                matched_files = list(self.base_dir.glob(str(pattern)))
             else:
-                input_files = [Path(pattern)]
+                matched_files = [Path(pattern)]
             
-            for input_file in input_files:
+            for input_file in matched_files:
                 if input_file.exists() and input_file.suffix.lower() in ['.xlsx', '.xls']:
-                    try:
-                        result = self.process_file(input_file)
-                        results.append(result)
-                        logger.info(f"✅ Processed: {input_file} → {result}")
-                    except Exception as e:
-                        logger.error(f"❌ Failed to process {input_file}: {e}")
+                    input_files.append(input_file)
                 else:
                     logger.warning(f"⚠️  Skipped: {input_file} (not found or not Excel file)")
         
-        return results
+        return process_files_in_parallel(self.process_file, input_files, jobs, logger)
 
 def main():
     """Command line interface for standalone header processing"""
@@ -339,6 +313,8 @@ def main():
     parser.add_argument('-d', '--base-dir', help='Base directory', default='.')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose logging')
     parser.add_argument('--batch', action='store_true', help='Batch mode for multiple files')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes for batch mode (default: 1, serial; 0 = one per CPU)')
     
     args = parser.parse_args()
     
@@ -353,7 +329,7 @@ def main():
         if args.batch or len(args.input) > 1:
             # Multiple files mode
             output_dir = args.output if args.output else None
-            results = processor.process_multiple_files(args.input, output_dir)
+            results = processor.process_multiple_files(args.input, output_dir, args.jobs)
             
             print("\n📊 Batch Processing Results:")
             print(f"✅ Successfully processed: {len(results)} files")
@@ -16,6 +16,7 @@ OUTPUT: Formatted template file (data/output/output-X-Step3.xlsx)
 
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
 import logging
 from pathlib import Path
 from typing import Union, Optional
@@ -72,6 +73,18 @@ class TemplateCreator:
         }
         
         self.header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        
+        # Header font/fill per (background, font color) pair - only 4 distinct pairs
+        self.header_styles = {}
+        for header_info in self.template_headers:
+            key = (header_info["bg_color"], header_info["font_color"])
+            if key not in self.header_styles:
+                self.header_styles[key] = (
+                    Font(bold=True, color=header_info["font_color"]),
+                    PatternFill(start_color=header_info["bg_color"],
+                                end_color=header_info["bg_color"],
+                                fill_type="solid")
+                )
     
     def create_template(self, input_file: Union[str, Path], 
                        output_file: Optional[Union[str, Path]] = None) -> str:
@@ -116,19 +129,14 @@ class TemplateCreator:
         for col_idx, header_info in enumerate(self.template_headers, 1):
             cell = ws.cell(10, col_idx, header_info["name"])
             
-            # Apply font with specific color for each column
-            cell.font = Font(bold=True, color=header_info["font_color"])
-            
-            # Apply background color
-            cell.fill = PatternFill(start_color=header_info["bg_color"], 
-                                   end_color=header_info["bg_color"], 
-                                   fill_type="solid")
+            # Apply the column's font color and background color
+            cell.font, cell.fill = self.header_styles[(header_info["bg_color"], header_info["font_color"])]
             
             # Apply alignment
             cell.alignment = self.header_alignment
             
             # Set column width
-            col_letter = chr(64 + col_idx)
+            col_letter = get_column_letter(col_idx)
             ws.column_dimensions[col_letter].width = header_info["width"]
         
         logger.info(f"✅ Created formatted template with {len(self.template_headers)} headers")
@@ -51,7 +51,8 @@ class ArticleFiller:
     
     def fill_article_info(self, input_file: Union[str, Path], 
                           step3_file: Union[str, Path],
-                          output_file: Optional[Union[str, Path]] = None) -> str:
+                          output_file: Optional[Union[str, Path]] = None,
+                          skip_preflight: bool = False) -> str:
         """
         Fill Article Name and Number from input file into Step 3 template
         
@@ -59,6 +60,7 @@ class ArticleFiller:
             input_file: Original input file (input-X.xlsx) 
             step3_file: Step 3 template file (output-X-Step3.xlsx)
             output_file: Optional output file path (if None, auto-generate)
+            skip_preflight: Skip pre-flight validation (caller already validated the input)
             
         Returns:
             Path to filled file
@@ -66,16 +68,20 @@ class ArticleFiller:
         logger.info("📋 Step 4: Article Information Filling - Content Preparation")
         
         # Pre-flight validation to prevent pipeline failures
-        logger.info("🔍 Running pre-flight validation...")
-        if not validate_before_pipeline(input_file, verbose=True):
-            logger.error("💥 Pre-flight validation failed - pipeline cannot continue")
-            raise ValidationError(
-                "Input validation failed - please fix the issues above and try again",
-                error_code="PREFLIGHT_VALIDATION_FAILED",
-                severity=ValidationError.CRITICAL,
-                category=ValidationError.FILE_ERROR,
-                step="Step 4"
-            )
+        # (skipped when the caller already validated the input, avoiding two extra workbook loads)
+        if skip_preflight:
+            logger.info("⏭️  Skipping pre-flight validation (already validated by caller)")
+        else:
+            logger.info("🔍 Running pre-flight validation...")
+            if not validate_before_pipeline(input_file, verbose=True):
+                logger.error("💥 Pre-flight validation failed - pipeline cannot continue")
+                raise ValidationError(
+                    "Input validation failed - please fix the issues above and try again",
+                    error_code="PREFLIGHT_VALIDATION_FAILED",
+                    severity=ValidationError.CRITICAL,
+                    category=ValidationError.FILE_ERROR,
+                    step="Step 4"
+                )
         
         # Use validated paths (pre-flight validation already checked main input file)
         input_path = Path(input_file)
@@ -97,8 +103,9 @@ class ArticleFiller:
         logger.info(f"Output: {output_file}")
         
         # Load input file with enhanced error handling
+        # (only read, never saved, so external link parts are not parsed)
         try:
-            input_wb = openpyxl.load_workbook(str(input_path))
+            input_wb = openpyxl.load_workbook(str(input_path), keep_links=False)
             input_ws = input_wb.active
         except Exception as e:
             error_msg = ErrorHandler.handle_file_error(e, input_path, "loading input file")
@@ -230,7 +237,7 @@ class ArticleFiller:
             no_str = str(no_value) if no_value is not None else ""
             
             articles.append((name_str, no_str))
-            logger.debug(f"Row {data_row}: Name=\"{name_str}\" | No.=\"{no_str}\"")
+            logger.debug("Row %d: Name=\"%s\" | No.=\"%s\"", data_row, name_str, no_str)
             
             data_row += 1
         
@@ -17,6 +17,7 @@ OUTPUT: Populated data file (output-X-Step5.xlsx)
 
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
 import logging
 from pathlib import Path
 from typing import Union, Optional, List, Tuple
@@ -86,7 +87,8 @@ class DataTransformer:
         logger.info(f"Output: {output_file}")
         
         # Load source data and template
-        source_wb = openpyxl.load_workbook(str(step2_path))
+        # (source is only read, never saved, so external link parts are not parsed)
+        source_wb = openpyxl.load_workbook(str(step2_path), keep_links=False)
         source_ws = source_wb.active
         
         # Copy template as starting point
@@ -250,6 +252,8 @@ class DataTransformer:
         """
         current_output_row = 11  # Start populating output from row 11
         total_rows_created = 0
+        # The per-output-row message below needs a column letter, so only build it when debugging
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         
         # Find last row with data
         last_data_row = self._find_last_data_row(source_ws, first_data_row)
@@ -264,10 +268,10 @@ class DataTransformer:
             horizontal_cols = self._scan_horizontal_data(source_ws, data_row, header_row)
             
             if not horizontal_cols:
-                logger.debug(f"No horizontal data found in row {data_row}, skipping")
+                logger.debug("No horizontal data found in row %d, skipping", data_row)
                 continue
             
-            logger.debug(f"Row {data_row}: Base data = {base_data}, Horizontal cols = {len(horizontal_cols)}")
+            logger.debug("Row %d: Base data = %s, Horizontal cols = %d", data_row, base_data, len(horizontal_cols))
             
             # Process each non-empty horizontal cell
             for col_idx, source_col in enumerate(horizontal_cols):
@@ -288,7 +292,9 @@ class DataTransformer:
                 output_ws.cell(current_output_row, 12, four_row_data['limit'])               # L
                 output_ws.cell(current_output_row, 14, four_row_data['frequency'])           # N
                 
-                logger.debug(f"Output row {current_output_row}: Data row {data_row}, Col {chr(64+source_col)} → {four_row_data}")
+                if debug_enabled:
+                    logger.debug("Output row %d: Data row %d, Col %s → %s",
+                                 current_output_row, data_row, get_column_letter(source_col), four_row_data)
                 current_output_row += 1
                 total_rows_created += 1
         
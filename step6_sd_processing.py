@@ -89,7 +89,8 @@ class SDProcessor:
         logger.info(f"Output: {output_file}")
         
         # Load source files
-        step2_wb = openpyxl.load_workbook(str(step2_path))
+        # (Step 2 is only read, never saved, so external link parts are not parsed)
+        step2_wb = openpyxl.load_workbook(str(step2_path), keep_links=False)
         step2_ws = step2_wb.active
         
         # Copy Step 5 as starting point
@@ -176,12 +177,12 @@ class SDProcessor:
             
             # Check if G column has valid data (skip N/A, "Không", empty)
             if not self._is_valid_sd_value(g_value):
-                logger.debug(f"Skipping row {source_row}: Invalid G value '{g_value}'")
+                logger.debug("Skipping row %d: Invalid G value '%s'", source_row, g_value)
                 continue
             
             # Parse multi-line G column value
             g_lines = self._parse_multiline_value(g_value)
-            logger.debug(f"Row {source_row}: F='{f_value}', H='{h_value}', G has {len(g_lines)} lines")
+            logger.debug("Row %d: F='%s', H='%s', G has %d lines", source_row, f_value, h_value, len(g_lines))
             
             # Create output row(s) for each G line
             for line_idx, g_line in enumerate(g_lines):
@@ -203,7 +204,7 @@ class SDProcessor:
                 # G19 lines → Q
                 output_ws.cell(current_output_row, 17, g_line.strip())  # Q (column 17)
                 
-                logger.debug(f"Added output row {current_output_row}: F={f_value}, P={h_value}, Q='{g_line.strip()}'")
+                logger.debug("Added output row %d: F=%s, P=%s, Q='%s'", current_output_row, f_value, h_value, g_line.strip())
                 current_output_row += 1
                 rows_added += 1
         
@@ -329,14 +330,14 @@ class SDProcessor:
         for row_num, row_data in rows_data:
             if row_data in seen_rows:
                 rows_to_delete.append(row_num)
-                logger.debug(f"Marking row {row_num} for deletion (duplicate - all columns match)")
+                logger.debug("Marking row %d for deletion (duplicate - all columns match)", row_num)
             else:
                 seen_rows.add(row_data)
         
         # Delete duplicate rows (in reverse order to maintain row numbers)
         for row_num in sorted(rows_to_delete, reverse=True):
             worksheet.delete_rows(row_num, 1)
-            logger.debug(f"Deleted duplicate row {row_num}")
+            logger.debug("Deleted duplicate row %d", row_num)
         
         logger.info(f"🗑️  Removed {len(rows_to_delete)} duplicate rows")
         
@@ -129,7 +129,7 @@ class FinishedProductProcessor:
             
             # Check if this is a finished product row
             if self._is_finished_product(b_value):
-                logger.debug(f"Row {row}: Found finished product pattern: '{b_value}'")
+                logger.debug("Row %d: Found finished product pattern: '%s'", row, b_value)
                 
                 # Apply transformations
                 worksheet.cell(row, 1).value = "Art"  # A = "Art"
@@ -139,7 +139,7 @@ class FinishedProductProcessor:
                 worksheet.cell(row, 6).value = ""     # F = empty
                 
                 processed_count += 1
-                logger.debug(f"Row {row}: Applied transformations - A='Art', B/C/D/F=empty")
+                logger.debug("Row %d: Applied transformations - A='Art', B/C/D/F=empty", row)
         
         return processed_count
     
@@ -298,9 +298,12 @@ class FinishedProductProcessor:
         
         processed_count = 0
         max_row = worksheet.max_row
+        # Per-row messages below build column lists, so only format them when debugging
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         
-        logger.debug(f"Processing article matching from P11 to P{max_row}")
-        logger.debug(f"Article columns: {[(chr(64+col) if col <= 26 else f'col{col}', name) for col, name in article_headers]}")
+        logger.debug("Processing article matching from P11 to P%d", max_row)
+        if debug_enabled:
+            logger.debug(f"Article columns: {[(chr(64+col) if col <= 26 else f'col{col}', name) for col, name in article_headers]}")
         
         for row in range(11, max_row + 1):
             # Get value from column P
@@ -314,7 +317,7 @@ class FinishedProductProcessor:
                 # P is empty - fill "X" in all article columns
                 for col, article_name in article_headers:
                     worksheet.cell(row, col).value = "X"
-                logger.debug(f"Row {row}: P empty - filled all article columns with 'X'")
+                logger.debug("Row %d: P empty - filled all article columns with 'X'", row)
                 processed_count += 1
                 continue
             
@@ -322,7 +325,7 @@ class FinishedProductProcessor:
             if self._is_all_items(p_value):
                 for col, article_name in article_headers:
                     worksheet.cell(row, col).value = "X"
-                logger.debug(f"Row {row}: P contains 'All' pattern - filled all article columns with 'X'")
+                logger.debug("Row %d: P contains 'All' pattern - filled all article columns with 'X'", row)
                 processed_count += 1
                 continue
             
@@ -334,16 +337,18 @@ class FinishedProductProcessor:
                 for col, article_name in article_headers:
                     if self._match_article_name(p_line, article_name):
                         matched_articles.add(col)
-                        logger.debug(f"Row {row}: '{p_line}' matches '{article_name}' -> column {chr(64+col) if col <= 26 else f'col{col}'}")
+                        if debug_enabled:
+                            logger.debug(f"Row {row}: '{p_line}' matches '{article_name}' -> column {chr(64+col) if col <= 26 else f'col{col}'}")
             
             # Fill "X" for matched articles
             if matched_articles:
                 for col in matched_articles:
                     worksheet.cell(row, col).value = "X"
-                logger.debug(f"Row {row}: Filled 'X' in columns {[chr(64+col) if col <= 26 else f'col{col}' for col in matched_articles]}")
+                if debug_enabled:
+                    logger.debug(f"Row {row}: Filled 'X' in columns {[chr(64+col) if col <= 26 else f'col{col}' for col in matched_articles]}")
             else:
                 # No matches found - log for debugging
-                logger.debug(f"Row {row}: No article matches found for P value: {p_lines}")
+                logger.debug("Row %d: No article matches found for P value: %s", row, p_lines)
             
             processed_count += 1
         
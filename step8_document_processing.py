@@ -127,12 +127,12 @@ class DocumentProcessor:
             if q_value and isinstance(q_value, str):
                 if 'finished product' in q_value.lower():
                     rows_to_delete.append(row)
-                    logger.debug(f"Marking row {row} for deletion: '{q_value}'")
+                    logger.debug("Marking row %d for deletion: '%s'", row, q_value)
         
         # Delete rows in reverse order to maintain indices
         for row_num in sorted(rows_to_delete, reverse=True):
             worksheet.delete_rows(row_num, 1)
-            logger.debug(f"Deleted row {row_num}")
+            logger.debug("Deleted row %d", row_num)
         
         return len(rows_to_delete)
     
@@ -169,12 +169,12 @@ class DocumentProcessor:
             # Fill document type in column H (column 8)
             if doc_type:
                 worksheet.cell(row, 8, doc_type)
-                logger.debug(f"Row {row}: Document type '{doc_type}' → H{row}")
+                logger.debug("Row %d: Document type '%s' → H%d", row, doc_type, row)
             
             # Fill requirement source in column I (column 9)
             if req_source:
                 worksheet.cell(row, 9, req_source)
-                logger.debug(f"Row {row}: Requirement source '{req_source}' → I{row}")
+                logger.debug("Row %d: Requirement source '%s' → I%d", row, req_source, row)
             
             rows_processed += 1
         
@@ -276,7 +276,7 @@ class DocumentProcessor:
             if p_cell.value is not None:
                 p_cell.value = None
                 cleared_count += 1
-                logger.debug(f"Cleared P{row}")
+                logger.debug("Cleared P%d", row)
         
         return cleared_count
     
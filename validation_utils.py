@@ -6,6 +6,7 @@ Provides robust input validation, error handling, and fallback mechanisms
 
 import openpyxl
 import logging
+from datetime import datetime
 from pathlib import Path
 from typing import Union, Optional, List, Tuple, Dict
 import re
@@ -37,7 +38,7 @@ class ValidationError(Exception):
         self.category = category or "UNKNOWN"
         self.suggestions = suggestions or []
         self.step = step
-        self.timestamp = __import__('datetime').datetime.now()
+        self.timestamp = datetime.now()
     
     def __str__(self):
         return f"[{self.severity}] {self.args[0]}"
@@ -71,6 +72,15 @@ class FileValidator:
     MIN_ROWS = 10
     MIN_COLS = 5
     
+    # Excel sheet limits: a read-only sheet reporting these (or no size at all)
+    # has a <dimension> tag that cannot be trusted
+    EXCEL_MAX_ROWS = 1048576
+    EXCEL_MAX_COLS = 16384
+    
+    # A <mergeCell .../> element (optionally namespace-prefixed), but not <mergeCells>
+    MERGE_CELL_TAG = re.compile(rb'<(?:[A-Za-z_][\w.-]*:)?mergeCell[\s/>]')
+    XML_CHUNK_SIZE = 1024 * 1024
+    
     @classmethod
     def validate_input_file(cls, file_path: Union[str, Path]) -> Path:
         """
@@ -87,8 +97,10 @@ class FileValidator:
         """
         file_path = Path(file_path)
         
-        # Check file existence
-        if not file_path.exists():
+        # Check file existence (one stat, reused for the size check below)
+        try:
+            file_size = file_path.stat().st_size
+        except (FileNotFoundError, NotADirectoryError):
             raise ValidationError(
                 f"Input file not found: {file_path}\n"
                 f"Please check the file path and ensure the file exists."
@@ -103,7 +115,7 @@ class FileValidator:
             )
         
         # Check file size
-        file_size_mb = file_path.stat().st_size / (1024 * 1024)
+        file_size_mb = file_size / (1024 * 1024)
         if file_size_mb > cls.MAX_FILE_SIZE_MB:
             logger.warning(
                 f"⚠️  Large file detected: {file_size_mb:.1f}MB (recommended max: {cls.MAX_FILE_SIZE_MB}MB)\n"
@@ -120,12 +132,49 @@ class FileValidator:
         return file_path
     
     @classmethod
-    def validate_excel_structure(cls, file_path: Path) -> Dict[str, any]:
+    def load_workbook_read_only(cls, file_path: Path):
+        """
+        Load an Excel file read-only (cached values, no links) with actionable load errors
+        
+        Args:
+            file_path: Path to Excel file
+            
+        Returns:
+            Read-only openpyxl workbook (caller closes it)
+            
+        Raises:
+            ValidationError: If the file cannot be loaded
+        """
+        try:
+            # Validation only inspects displayed values, so read cached formula results
+            return openpyxl.load_workbook(str(file_path), read_only=True, keep_links=False, data_only=True)
+        except openpyxl.utils.exceptions.InvalidFileException as e:
+            raise ValidationError(
+                f"Invalid Excel file: {file_path}\n"
+                f"Error: {str(e)}\n"
+                f"Please ensure this is a valid Excel file and not corrupted."
+            )
+        except PermissionError as e:
+            raise ValidationError(
+                f"Permission denied accessing file: {file_path}\n"
+                f"Please close the file in Excel and try again."
+            )
+        except Exception as e:
+            raise ValidationError(
+                f"Failed to read Excel file: {file_path}\n"
+                f"Error: {str(e)}\n"
+                f"Please check if the file is corrupted or in use by another application."
+            )
+    
+    @classmethod
+    def validate_excel_structure(cls, file_path: Path, workbook=None) -> Dict[str, any]:
         """
         Validate Excel file structure and content
         
         Args:
             file_path: Path to Excel file
+            workbook: Optional workbook already loaded read-only from file_path
+                      (left open for the caller); loaded and closed here if None
             
         Returns:
             Dictionary with file statistics
@@ -133,17 +182,31 @@ class FileValidator:
         Raises:
             ValidationError: If structure validation fails
         """
+        owns_workbook = workbook is None
+        if owns_workbook:
+            workbook = cls.load_workbook_read_only(file_path)
+        
         try:
-            # Try to load workbook
-            workbook = openpyxl.load_workbook(str(file_path), read_only=True)
             worksheet = workbook.active
             
+            # Read-only dimensions come straight from the sheet's <dimension> tag;
+            # recount them from the cells when it is missing or claims the full sheet
+            dimensions_trustworthy = (
+                worksheet.max_row not in (None, cls.EXCEL_MAX_ROWS)
+                and worksheet.max_column not in (None, cls.EXCEL_MAX_COLS)
+            )
+            if not dimensions_trustworthy:
+                logger.warning("⚠️  Sheet dimensions missing or at Excel limits - recalculating from cell data")
+                worksheet.reset_dimensions()
+                worksheet.calculate_dimension(force=True)
+            
             # Get basic statistics
             stats = {
                 'max_row': worksheet.max_row,
                 'max_col': worksheet.max_column,
                 'sheet_name': worksheet.title,
-                'file_size_mb': file_path.stat().st_size / (1024 * 1024)
+                'file_size_mb': file_path.stat().st_size / (1024 * 1024),
+                'dimensions_trustworthy': dimensions_trustworthy
             }
             
             # Check minimum dimensions
@@ -159,15 +222,13 @@ class FileValidator:
                     f"(recommended min: {cls.MIN_COLS} columns)"
                 )
             
-            # Check for completely empty file
-            has_data = False
-            for row in range(1, min(11, stats['max_row'] + 1)):  # Check first 10 rows
-                for col in range(1, min(11, stats['max_col'] + 1)):  # Check first 10 cols
-                    if worksheet.cell(row, col).value is not None:
-                        has_data = True
-                        break
-                if has_data:
-                    break
+            # Check for completely empty file (first 10 rows x 10 cols)
+            # Stream values in one pass - ws.cell() re-scans the sheet XML in read-only mode
+            has_data = any(
+                value is not None
+                for row_values in worksheet.iter_rows(min_row=1, max_row=10, max_col=10, values_only=True)
+                for value in row_values
+            )
             
             if not has_data:
                 raise ValidationError(
@@ -175,16 +236,9 @@ class FileValidator:
                     f"Please ensure the file contains data in the first 10 rows and columns."
                 )
             
-            workbook.close()
             logger.debug(f"Excel validation passed: {stats}")
             return stats
             
-        except openpyxl.utils.exceptions.InvalidFileException as e:
-            raise ValidationError(
-                f"Invalid Excel file: {file_path}\n"
-                f"Error: {str(e)}\n"
-                f"Please ensure this is a valid Excel file and not corrupted."
-            )
         except PermissionError as e:
             raise ValidationError(
                 f"Permission denied accessing file: {file_path}\n"
@@ -196,6 +250,56 @@ class FileValidator:
                 f"Error: {str(e)}\n"
                 f"Please check if the file is corrupted or in use by another application."
             )
+        finally:
+            if owns_workbook:
+                workbook.close()
+
+    @classmethod
+    def count_merged_ranges(cls, worksheet, file_path: Union[str, Path]) -> int:
+        """
+        Count merged ranges on a worksheet
+        
+        ReadOnlyWorksheet does not parse merged cells, so the <mergeCell> elements
+        are counted with a byte scan of the sheet XML instead of a full workbook load.
+        That relies on openpyxl's private _get_source(); if a future openpyxl drops
+        it, the workbook is loaded normally and its merged cells are counted.
+        
+        Args:
+            worksheet: openpyxl worksheet, usually from a workbook loaded with read_only=True
+            file_path: Path of the workbook the worksheet belongs to
+            
+        Returns:
+            Number of merged ranges
+        """
+        if hasattr(worksheet, "merged_cells"):
+            return len(worksheet.merged_cells.ranges)
+        
+        get_source = getattr(worksheet, "_get_source", None)
+        if get_source is None:
+            logger.debug("Worksheet has no _get_source(); loading %s to count merged cells", file_path)
+            workbook = openpyxl.load_workbook(file_path, keep_links=False)
+            try:
+                return len(workbook[worksheet.title].merged_cells.ranges)
+            finally:
+                workbook.close()
+        
+        count = 0
+        tail = b""
+        with get_source() as source:
+            while True:
+                chunk = source.read(cls.XML_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                # Only scan up to the last '<' so a tag split across chunks is counted once
+                buffer = tail + chunk
+                cut = buffer.rfind(b"<")
+                if cut == -1:
+                    cut = len(buffer)
+                count += len(cls.MERGE_CELL_TAG.findall(buffer, 0, cut))
+                tail = buffer[cut:]
+        
+        return count + len(cls.MERGE_CELL_TAG.findall(tail))
 
 class HeaderDetector:
     """
@@ -208,6 +312,23 @@ class HeaderDetector:
         """Calculate similarity between two strings (0-1)"""
         return SequenceMatcher(None, a.lower(), b.lower()).ratio()
     
+    @staticmethod
+    def _iter_header_rows(worksheet, max_rows: int):
+        """
+        Enumerate (row, row_values) over the first max_rows rows
+        
+        Args:
+            worksheet: openpyxl worksheet, or a list of row value tuples already
+                       read from one (e.g. from a read-only workbook)
+            max_rows: Maximum rows to yield
+        """
+        if isinstance(worksheet, list):
+            rows = worksheet[:max_rows]
+        else:
+            # Clamp to max_row: iter_rows on a normal worksheet creates any cell it visits
+            rows = worksheet.iter_rows(max_row=min(max_rows, worksheet.max_row), values_only=True)
+        return enumerate(rows, start=1)
+    
     @classmethod
     def find_header_fuzzy(cls, worksheet, target_patterns: List[str], 
                          min_similarity: float = 0.7, max_search_rows: int = 50) -> Optional[Tuple[int, int, str, float]]:
@@ -215,7 +336,7 @@ class HeaderDetector:
         Find header using fuzzy matching with multiple patterns
         
         Args:
-            worksheet: openpyxl worksheet
+            worksheet: openpyxl worksheet or list of row value tuples
             target_patterns: List of patterns to search for
             min_similarity: Minimum similarity score (0-1)
             max_search_rows: Maximum rows to search
@@ -226,18 +347,21 @@ class HeaderDetector:
         best_match = None
         best_score = 0
         
-        for row in range(1, min(max_search_rows + 1, worksheet.max_row + 1)):
-            for col in range(1, worksheet.max_column + 1):
-                cell_value = worksheet.cell(row, col).value
+        # Lowercase each pattern and cell once instead of on every comparison
+        lowered_patterns = [(pattern, pattern.lower()) for pattern in target_patterns]
+        
+        for row, row_values in cls._iter_header_rows(worksheet, max_search_rows):
+            for col, cell_value in enumerate(row_values, start=1):
                 if not cell_value or not isinstance(cell_value, str):
                     continue
                 
                 cell_text = cell_value.strip()
                 if not cell_text:
                     continue
+                cell_lower = cell_text.lower()
                 
-                for pattern in target_patterns:
-                    similarity = cls.similarity(cell_text, pattern)
+                for pattern, pattern_lower in lowered_patterns:
+                    similarity = SequenceMatcher(None, cell_lower, pattern_lower).ratio()
                     if similarity >= min_similarity and similarity > best_score:
                         best_score = similarity
                         best_match = (row, col, cell_text, similarity)
@@ -250,6 +374,9 @@ class HeaderDetector:
         """
         Find 'General Type/Sub-Type in Connect' header with fallbacks
         
+        Args:
+            worksheet: openpyxl worksheet or list of row value tuples
+            
         Returns:
             Tuple of (row, col, matched_text) or None if not found
         """
@@ -270,15 +397,30 @@ class HeaderDetector:
             "sub type"
         ]
         
-        # Try primary patterns with exact matching
-        for pattern in primary_patterns:
-            for row in range(1, min(51, worksheet.max_row + 1)):
-                for col in range(1, worksheet.max_column + 1):
-                    cell_value = worksheet.cell(row, col).value
-                    if cell_value and isinstance(cell_value, str):
-                        if pattern.lower() in cell_value.lower().strip():
-                            logger.debug(f"Found exact header match: '{cell_value}' at row {row}, col {col}")
-                            return (row, col, cell_value)
+        # Try primary patterns with exact matching, in a single pass that normalizes
+        # each cell once: the first pattern wins outright, later patterns only keep
+        # their first hit in case no earlier pattern matches anywhere
+        primary_lower = [pattern.lower() for pattern in primary_patterns]
+        first_hits = [None] * len(primary_lower)
+        for row, row_values in cls._iter_header_rows(worksheet, 50):
+            for col, cell_value in enumerate(row_values, start=1):
+                if not cell_value or not isinstance(cell_value, str):
+                    continue
+                
+                cell_lower = cell_value.lower().strip()
+                for index, pattern_lower in enumerate(primary_lower):
+                    if first_hits[index] is None and pattern_lower in cell_lower:
+                        first_hits[index] = (row, col, cell_value)
+                if first_hits[0] is not None:
+                    break
+            if first_hits[0] is not None:
+                break
+        
+        for hit in first_hits:
+            if hit is not None:
+                row, col, cell_value = hit
+                logger.debug(f"Found exact header match: '{cell_value}' at row {row}, col {col}")
+                return hit
         
         # Try fallback patterns with fuzzy matching
         result = cls.find_header_fuzzy(worksheet, fallback_patterns, min_similarity=0.6)
@@ -294,31 +436,38 @@ class HeaderDetector:
         """
         Find Article Name and Article Number headers with fallbacks
         
+        Args:
+            worksheet: openpyxl worksheet or list of row value tuples
+            max_search_rows: Maximum rows to search
+            
         Returns:
             Tuple of (name_col, number_col, header_row) or None if not found
         """
         name_patterns = ["Article Name", "article name", "name", "product name"]
         number_patterns = ["Article No.", "Article No", "article no", "number", "product no", "art no"]
         
-        for row in range(1, min(max_search_rows + 1, worksheet.max_row + 1)):
+        # Lowercase the patterns once rather than per cell
+        name_patterns = [pattern.lower() for pattern in name_patterns]
+        number_patterns = [pattern.lower() for pattern in number_patterns]
+        
+        for row, row_values in cls._iter_header_rows(worksheet, max_search_rows):
             name_col = None
             number_col = None
             
             # Scan row for article headers
-            for col in range(1, worksheet.max_column + 1):
-                cell_value = worksheet.cell(row, col).value
+            for col, cell_value in enumerate(row_values, start=1):
                 if not cell_value or not isinstance(cell_value, str):
                     continue
                 
                 cell_text = cell_value.strip().lower()
                 
                 # Check for name patterns
-                if not name_col and any(pattern.lower() in cell_text for pattern in name_patterns):
+                if not name_col and any(pattern in cell_text for pattern in name_patterns):
                     name_col = col
                     logger.debug(f"Found Article Name at row {row}, col {col}: '{cell_value}'")
                 
                 # Check for number patterns  
-                if not number_col and any(pattern.lower() in cell_text for pattern in number_patterns):
+                if not number_col and any(pattern in cell_text for pattern in number_patterns):
                     number_col = col
                     logger.debug(f"Found Article Number at row {row}, col {col}: '{cell_value}'")
             